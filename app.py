@@ -1,10 +1,20 @@
 import os
 import sys
+import time
 import logging
+import threading
 from datetime import datetime, timezone
 from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    CONTENT_TYPE_LATEST,
+)
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -68,6 +78,66 @@ REQUEST_DURATION = Histogram(
     ["method", "endpoint"],
 )
 
+# Saturation metrics (used as HPA custom metrics)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+WORKER_REQUESTS_IN_FLIGHT = Gauge(
+    "worker_requests_in_flight",
+    "HTTP requests currently being processed by this worker",
+    multiprocess_mode="liveall",
+)
+WORKER_BUSY_RATIO = Gauge(
+    "worker_busy_ratio",
+    "Fraction of this worker's request slots currently in use",
+    multiprocess_mode="liveall",
+)
+REQUEST_QUEUE_WAIT = Histogram(
+    "http_request_queue_wait_seconds",
+    "Time from X-Request-Start to view entry in seconds",
+    buckets=(
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    ),
+)
+
+
+def worker_capacity():
+    """Concurrent requests a gunicorn worker can serve
+
+    Async workers (gevent/eventlet) serve up to worker_connections requests,
+    sync/gthread workers one per thread.
+    """
+    worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync").lower()
+    if "gevent" in worker_class or "eventlet" in worker_class:
+        return max(int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "1000")), 1)
+    return max(int(os.environ.get("GUNICORN_THREADS", "0")), 1)
+
+
+WORKER_CAPACITY = worker_capacity()
+
+# Accepted X-Request-Start range: a little clock skew into the future and at
+# most the gunicorn worker timeout into the past
+REQUEST_START_MAX_SKEW = 1.0
+REQUEST_START_MAX_AGE = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+_in_flight_lock = threading.Lock()
+_in_flight = 0
+
 # Application metadata
 APP_INFO = {
     "name": "learn-python",
@@ -86,6 +156,67 @@ def log_request():
     request._start_time = datetime.now(timezone.utc)
 
 
+def parse_request_start(value, now=None):
+    """Parse an X-Request-Start header into seconds since epoch
+
+    Accepts "t=<value>" or a bare value in seconds (nginx ``${msec}``),
+    milliseconds, microseconds or nanoseconds, told apart by magnitude.
+    Timestamps outside the accepted range around ``now`` are rejected.
+    """
+    if value.startswith("t="):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+    if not 0 < started < 1e20:
+        return None
+    if started > 1e17:
+        started /= 1e9
+    elif started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+
+    now = time.time() if now is None else now
+    if not now - REQUEST_START_MAX_AGE <= started <= now + REQUEST_START_MAX_SKEW:
+        return None
+    return started
+
+
+# Middleware for saturation metrics
+@app.before_request
+def track_in_flight():
+    global _in_flight
+    if request.endpoint == "metrics":
+        return
+
+    now = time.time()
+    started = parse_request_start(request.headers.get("X-Request-Start", ""), now)
+    if started is not None:
+        REQUEST_QUEUE_WAIT.observe(max(now - started, 0.0))
+
+    request._in_flight_endpoint = request.endpoint or "unknown"
+    REQUESTS_IN_FLIGHT.labels(endpoint=request._in_flight_endpoint).inc()
+    with _in_flight_lock:
+        _in_flight += 1
+        WORKER_REQUESTS_IN_FLIGHT.set(_in_flight)
+        WORKER_BUSY_RATIO.set(_in_flight / WORKER_CAPACITY)
+
+
+@app.teardown_request
+def release_in_flight(error=None):
+    global _in_flight
+    if not hasattr(request, "_in_flight_endpoint"):
+        return
+
+    REQUESTS_IN_FLIGHT.labels(endpoint=request._in_flight_endpoint).dec()
+    with _in_flight_lock:
+        _in_flight -= 1
+        WORKER_REQUESTS_IN_FLIGHT.set(_in_flight)
+        WORKER_BUSY_RATIO.set(_in_flight / WORKER_CAPACITY)
+
+
 # Security headers middleware
 @app.after_request
 def set_security_headers(response):
@@ -291,6 +422,11 @@ def echo():
 @app.route("/metrics")
 def metrics():
     """Prometheus metrics endpoint"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Aggregate metrics across all gunicorn workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
 
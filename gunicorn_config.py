@@ -30,3 +30,35 @@ limit_request_fields = int(os.environ.get("GUNICORN_LIMIT_REQUEST_FIELDS", "100"
 limit_request_field_size = int(
     os.environ.get("GUNICORN_LIMIT_REQUEST_FIELD_SIZE", "8190")
 )
+
+# Request start header (consumed by the app to measure queue wait time).
+# Only a value stamped by a trusted proxy measures queueing, so it is kept
+# when GUNICORN_TRUST_REQUEST_START=true and stripped otherwise.
+REQUEST_START_HEADER = "X-REQUEST-START"
+
+
+def on_starting(server):
+    """Reset Prometheus multiprocess files left over from a previous run"""
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+
+
+def pre_request(worker, req):
+    """Strip a client-supplied X-Request-Start unless a proxy is trusted to set it"""
+    if os.environ.get("GUNICORN_TRUST_REQUEST_START", "false").lower() == "true":
+        return
+    req.headers = [
+        (name, value) for name, value in req.headers if name != REQUEST_START_HEADER
+    ]
+
+
+def child_exit(server, worker):
+    """Drop live gauges of dead workers from the Prometheus multiprocess view"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,13 @@
 import unittest
 import json
-from app import app
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+from prometheus_client import REGISTRY
+from app import app, parse_request_start, worker_capacity
 
 
 class TestFlaskAPI(unittest.TestCase):
@@ -96,6 +103,107 @@ class TestFlaskAPI(unittest.TestCase):
         self.assertEqual(response.headers.get("X-XSS-Protection"), "1; mode=block")
         self.assertIn("Content-Security-Policy", response.headers)
 
+    def test_metrics_saturation(self):
+        """Test GET /metrics exposes saturation metrics"""
+        self.client.get("/ping")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.data.decode("utf-8")
+        self.assertIn("http_requests_in_flight", body)
+        self.assertIn("worker_requests_in_flight", body)
+        self.assertIn("worker_busy_ratio", body)
+        self.assertIn("http_request_queue_wait_seconds", body)
+
+    def test_in_flight_released(self):
+        """Test in-flight gauges return to zero after a request"""
+        self.client.post(
+            "/echo", data=json.dumps({"a": 1}), content_type="application/json"
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value("http_requests_in_flight", {"endpoint": "echo"}),
+            0.0,
+        )
+        self.assertEqual(REGISTRY.get_sample_value("worker_requests_in_flight"), 0.0)
+        self.assertEqual(REGISTRY.get_sample_value("worker_busy_ratio"), 0.0)
+
+    def test_queue_wait_from_request_start(self):
+        """Test queue wait is observed from the X-Request-Start header"""
+        before = REGISTRY.get_sample_value("http_request_queue_wait_seconds_count")
+        before = before or 0.0
+        started = int((time.time() - 0.2) * 1_000_000)
+        self.client.get("/ping", headers={"X-Request-Start": f"t={started}"})
+        self.client.get("/ping", headers={"X-Request-Start": "t=invalid"})
+        self.client.get("/ping", headers={"X-Request-Start": "t=1"})
+        self.assertEqual(
+            REGISTRY.get_sample_value("http_request_queue_wait_seconds_count"),
+            before + 1,
+        )
+        self.assertGreaterEqual(
+            REGISTRY.get_sample_value("http_request_queue_wait_seconds_sum"), 0.2
+        )
+        self.assertLess(
+            REGISTRY.get_sample_value("http_request_queue_wait_seconds_sum"), 60
+        )
+
+    def test_worker_capacity(self):
+        """Test worker capacity follows the gunicorn worker class"""
+        with mock.patch.dict(
+            os.environ, {"GUNICORN_WORKER_CLASS": "sync", "GUNICORN_THREADS": "0"}
+        ):
+            self.assertEqual(worker_capacity(), 1)
+        with mock.patch.dict(
+            os.environ, {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_THREADS": "4"}
+        ):
+            self.assertEqual(worker_capacity(), 4)
+        with mock.patch.dict(
+            os.environ,
+            {"GUNICORN_WORKER_CLASS": "gevent", "GUNICORN_WORKER_CONNECTIONS": "500"},
+        ):
+            self.assertEqual(worker_capacity(), 500)
+
+    def test_parse_request_start(self):
+        """Test X-Request-Start parsing in seconds, ms, us and ns"""
+        now = 1700000000.5
+        for value in (
+            "t=1700000000.123",
+            "1700000000.123",
+            "t=1700000000123",
+            "t=1700000000123000",
+            "t=1700000000123000000",
+        ):
+            self.assertAlmostEqual(parse_request_start(value, now), 1700000000.123, 3)
+        for value in ("", "t=", "t=invalid", "t=-1", "t=nan", "t=inf"):
+            self.assertIsNone(parse_request_start(value, now))
+
+    def test_parse_request_start_out_of_range(self):
+        """Test X-Request-Start values far in the past or future are rejected"""
+        now = 1700000000.5
+        for value in ("t=1", "t=1699999000", "t=1700000010", "t=4102444800"):
+            self.assertIsNone(parse_request_start(value, now))
+        self.assertEqual(parse_request_start("t=1700000001.0", now), 1700000001.0)
+
+    def test_metrics_multiprocess(self):
+        """Test GET /metrics aggregates workers with PROMETHEUS_MULTIPROC_DIR"""
+        script = (
+            "from app import app\n"
+            "client = app.test_client()\n"
+            "client.get('/ping')\n"
+            "print(client.get('/metrics').data.decode('utf-8'))\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=tmp, FLASK_ENV="test")
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        self.assertIn('http_requests_in_flight{endpoint="ping"} 0.0', result.stdout)
+        self.assertRegex(result.stdout, r'worker_requests_in_flight\{pid="\d+"\}')
+        self.assertRegex(result.stdout, r'worker_busy_ratio\{pid="\d+"\}')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import gunicorn_config
+
+
+class TestGunicornHooks(unittest.TestCase):
+    """Test cases for gunicorn server hooks"""
+
+    def test_pre_request_strips_untrusted_header(self):
+        """Test pre_request drops a client-supplied X-Request-Start"""
+        req = SimpleNamespace(
+            headers=[("HOST", "localhost"), ("X-REQUEST-START", "t=1")]
+        )
+        with mock.patch.dict(os.environ, clear=True):
+            gunicorn_config.pre_request(None, req)
+        self.assertEqual(req.headers, [("HOST", "localhost")])
+
+    def test_pre_request_does_not_stamp(self):
+        """Test pre_request leaves X-Request-Start unset without a proxy"""
+        req = SimpleNamespace(headers=[("HOST", "localhost")])
+        with mock.patch.dict(os.environ, {"GUNICORN_TRUST_REQUEST_START": "true"}):
+            gunicorn_config.pre_request(None, req)
+        self.assertEqual(req.headers, [("HOST", "localhost")])
+
+    def test_pre_request_keeps_trusted_header(self):
+        """Test pre_request keeps X-Request-Start when the proxy is trusted"""
+        headers = [("HOST", "localhost"), ("X-REQUEST-START", "t=1700000000.123")]
+        req = SimpleNamespace(headers=list(headers))
+        with mock.patch.dict(os.environ, {"GUNICORN_TRUST_REQUEST_START": "true"}):
+            gunicorn_config.pre_request(None, req)
+        self.assertEqual(req.headers, headers)
+
+    def test_on_starting_clears_multiproc_dir(self):
+        """Test on_starting removes stale Prometheus .db files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("gauge_liveall_1.db", "counter_1.db", "keep.txt"):
+                open(os.path.join(tmp, name), "w").close()
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": tmp}):
+                gunicorn_config.on_starting(None)
+            self.assertEqual(os.listdir(tmp), ["keep.txt"])
+
+    def test_on_starting_creates_multiproc_dir(self):
+        """Test on_starting creates a missing multiprocess directory"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prometheus")
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": path}):
+                gunicorn_config.on_starting(None)
+            self.assertTrue(os.path.isdir(path))
+
+    def test_child_exit_marks_process_dead(self):
+        """Test child_exit marks the worker dead in multiprocess mode"""
+        worker = SimpleNamespace(pid=1234)
+        with mock.patch(
+            "prometheus_client.multiprocess.mark_process_dead"
+        ) as mark_process_dead:
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": "/tmp/x"}):
+                gunicorn_config.child_exit(None, worker)
+            mark_process_dead.assert_called_once_with(1234)
+
+    def test_child_exit_without_multiproc_dir(self):
+        """Test child_exit is a no-op without PROMETHEUS_MULTIPROC_DIR"""
+        with mock.patch(
+            "prometheus_client.multiprocess.mark_process_dead"
+        ) as mark_process_dead:
+            with mock.patch.dict(os.environ, clear=True):
+                gunicorn_config.child_exit(None, SimpleNamespace(pid=1234))
+            mark_process_dead.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()